@@ -1,8 +1,21 @@
+import io
 import streamlit as st
 import pandas as pd
-import pdfplumber
-import re
-from collections import Counter
+import numpy as np
+import pymupdf
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        # Without Numba the fallback scanner runs as plain Python
+        return lambda func: func
 
 st.set_page_config(page_title="PDF Glossary Checker", layout="centered")
 
@@ -14,44 +27,202 @@ source_pdf = st.file_uploader("Upload Source Language PDF", type=["pdf"])
 target_pdf = st.file_uploader("Upload Target Language PDF", type=["pdf"])
 benchmark_pdf = st.file_uploader("Upload Benchmark PDF (optional)", type=["pdf"])
 
-def extract_text_from_pdf(file):
-    text = ""
-    try:
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + " "
-    except Exception as e:
-        st.error(f"Error reading PDF: {e}")
-    return text.lower()
-
-def normalize_text(text):
-    return text.lower().strip()
-
-def count_terms(text, terms):
-    counter = Counter()
-    for term in terms:
-        pattern = r'\b' + re.escape(term.lower()) + r'\b'
-        matches = re.findall(pattern, text)
-        counter[term] = len(matches)
-    return counter
-
-def calculate_kpis_fixed(words, translations, source_counts, target_counts):
-    total_glossary_terms = len(words)
-    source_positive_terms = [w for w in words if source_counts.get(w, 0) > 0]
-    numerator = sum(
-        1 for w, t in zip(words, translations)
-        if source_counts.get(w, 0) > 0 and target_counts.get(t, 0) > 0
-    )
+@st.cache_data(show_spinner="Extracting PDF…", max_entries=12)
+def extract_pages_from_pdf(file_bytes):
+    # Cached on the file contents, so re-processing the same PDF skips parsing.
+    # Bounded to the last few runs so a long-lived server doesn't keep every upload.
+    # Errors are raised so the caller can report which PDF failed. All pages are held
+    # (and cached) at once; count_terms only avoids building one joined copy of them
+    pages = []
+    with pymupdf.open(stream=file_bytes, filetype="pdf") as pdf:
+        for page in pdf:
+            page_text = page.get_text("text")
+            if page_text:
+                pages.append(page_text.lower())
+    return pages
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_glossary(file_bytes):
+    return pd.read_excel(io.BytesIO(file_bytes))
+
+def is_word_char(char):
+    # Same character class as the regex \w used for word boundaries
+    return char.isalnum() or char == "_"
+
+@njit(cache=True)
+def follow_edge(state, code, edge_starts, edge_codes, edge_targets):
+    # Binary search over the state's trie edges, which are sorted by codepoint
+    low = edge_starts[state]
+    high = edge_starts[state + 1]
+    while low < high:
+        middle = (low + high) // 2
+        if edge_codes[middle] < code:
+            low = middle + 1
+        else:
+            high = middle
+    if low < edge_starts[state + 1] and edge_codes[low] == code:
+        return edge_targets[low]
+    return -1
+
+@njit(cache=True)
+def scan_codepoints(codes, edge_starts, edge_codes, edge_targets, fail, outputs, output_links):
+    # Two passes over the text: count the matches, then record them
+    ends = np.empty(0, dtype=np.int64)
+    word_ids = np.empty(0, dtype=np.int64)
+    for record in range(2):
+        found = 0
+        state = 0
+        for position in range(codes.shape[0]):
+            code = codes[position]
+            while True:
+                target = follow_edge(state, code, edge_starts, edge_codes, edge_targets)
+                if target >= 0:
+                    state = target
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            match_state = state if outputs[state] >= 0 else output_links[state]
+            while match_state >= 0:
+                if record:
+                    ends[found] = position
+                    word_ids[found] = outputs[match_state]
+                found += 1
+                match_state = output_links[match_state]
+        if not record:
+            ends = np.empty(found, dtype=np.int64)
+            word_ids = np.empty(found, dtype=np.int64)
+    return ends, word_ids
+
+class CodepointAutomaton:
+    # Aho-Corasick automaton over NumPy arrays, used when pyahocorasick is not installed.
+    # Mirrors the subset of the ahocorasick.Automaton API used by build_automaton/count_terms.
+    # Only the trie edges are stored (grouped per state, sorted by codepoint), so memory
+    # stays proportional to the glossary size even for large alphabets such as CJK
+
+    def __init__(self):
+        self.words = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    def add_word(self, word, value):
+        self.words[word] = value
+
+    def make_automaton(self):
+        words = list(self.words)
+        self.values = [self.words[w] for w in words]
+
+        children = [{}]
+        outputs = [-1]
+        for word_id, word in enumerate(words):
+            state = 0
+            for char in word:
+                code = ord(char)
+                if code not in children[state]:
+                    children.append({})
+                    outputs.append(-1)
+                    children[state][code] = len(children) - 1
+                state = children[state][code]
+            outputs[state] = word_id
+
+        # Breadth-first pass computing failure and output links
+        fail = [0] * len(children)
+        output_links = [-1] * len(children)
+        queue = deque(children[0].values())
+        while queue:
+            state = queue.popleft()
+            for code, child in children[state].items():
+                link = fail[state]
+                while link and code not in children[link]:
+                    link = fail[link]
+                link = children[link].get(code, 0)
+                fail[child] = link
+                output_links[child] = link if outputs[link] >= 0 else output_links[link]
+                queue.append(child)
+
+        edges = [sorted(state_children.items()) for state_children in children]
+        self.edge_starts = np.zeros(len(children) + 1, dtype=np.int64)
+        self.edge_starts[1:] = np.cumsum([len(state_edges) for state_edges in edges])
+        self.edge_codes = np.array([code for state_edges in edges for code, _ in state_edges], dtype=np.uint32)
+        self.edge_targets = np.array([child for state_edges in edges for _, child in state_edges], dtype=np.int64)
+        self.fail = np.array(fail, dtype=np.int64)
+        self.outputs = np.array(outputs, dtype=np.int64)
+        self.output_links = np.array(output_links, dtype=np.int64)
+
+    def iter(self, text):
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        ends, word_ids = scan_codepoints(
+            codes, self.edge_starts, self.edge_codes, self.edge_targets,
+            self.fail, self.outputs, self.output_links
+        )
+        values = self.values
+        return ((end, values[word_id]) for end, word_id in zip(ends.tolist(), word_ids.tolist()))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def build_automaton(terms):
+    # Terms are expected to be normalized (lowercased) and unique. Cached as a shared
+    # resource keyed on the terms, so re-runs with the same glossary skip construction;
+    # only the most recent glossaries are kept so edited ones don't pile up
+    automaton = ahocorasick.Automaton() if ahocorasick else CodepointAutomaton()
+    for index, term in enumerate(terms):
+        if term:
+            automaton.add_word(term, (index, len(term)))
+    if len(automaton):
+        automaton.make_automaton()
+    return automaton
+
+def count_terms(pages, automaton, terms):
+    # Single pass over the text for all terms instead of one regex scan per term.
+    # A combined regex alternation would also be one pass, but it only reports one
+    # term per position, so nested terms ("data" in "data center") would go uncounted.
+    # Pages are scanned one by one as if joined with spaces; each page is prefixed with
+    # the tail of the text before it, so terms spanning a page break are still found
+    counts = [0] * len(terms)
+    if not len(automaton):
+        return np.array(counts, dtype=np.int64)
+
+    max_length = max(map(len, terms))
+    last_end = [0] * len(terms)
+    tail = None
+    position = 0  # Offset of the current chunk in the joined text
+    for page in pages:
+        if tail is None:
+            chunk, fresh = page, 0
+        else:
+            chunk, fresh = tail + " " + page, len(tail) + 1
+        chunk_length = len(chunk)
+        for end, (index, length) in automaton.iter(chunk):
+            # Matches inside the carried-over tail were counted with the previous page
+            if end < fresh:
+                continue
+            start = end - length + 1
+            # Keep re.findall semantics: matches of the same term never overlap
+            if position + start < last_end[index]:
+                continue
+            # Keep \b semantics on both sides of the match
+            before = start > 0 and is_word_char(chunk[start - 1])
+            after = end + 1 < chunk_length and is_word_char(chunk[end + 1])
+            if before == is_word_char(chunk[start]) or after == is_word_char(chunk[end]):
+                continue
+            last_end[index] = position + end + 1
+            counts[index] += 1
+        tail = chunk[-max_length:]
+        position += chunk_length - len(tail)
+    return np.array(counts, dtype=np.int64)
+
+def calculate_kpis_fixed(src, tgt):
+    # src/tgt are count arrays aligned with the glossary rows
+    total_glossary_terms = len(src)
+    numerator = int(np.count_nonzero((src > 0) & (tgt > 0)))
     denominator_utilization = total_glossary_terms
-    denominator_coverage = len(source_positive_terms)
+    denominator_coverage = int(np.count_nonzero(src))
 
     utilization_rate = (numerator / denominator_utilization * 100) if denominator_utilization else 0
     coverage_rate = (numerator / denominator_coverage * 100) if denominator_coverage else 0
 
-    total_source_counts = sum(source_counts.get(w, 0) for w in words)
-    total_target_counts = sum(target_counts.get(t, 0) for t in translations)
+    total_source_counts = int(src.sum())
+    total_target_counts = int(tgt.sum())
     total_count_discrepancy = abs(total_source_counts - total_target_counts)
 
     return {
@@ -62,30 +233,32 @@ def calculate_kpis_fixed(words, translations, source_counts, target_counts):
         'total_target_counts': total_target_counts
     }
 
-def calculate_term_frequency_mismatch(words, translations, source_counts, target_counts):
-    mismatch_rates = []
-    for w, t in zip(words, translations):
-        source_count = source_counts.get(w, 0)
-        target_count = target_counts.get(t, 0)
-        denominator = source_count if source_count > 0 else 1  # avoid division by zero
-        mismatch = abs(target_count - source_count) / denominator
-        mismatch_rates.append(mismatch)
-    sum_mismatch = sum(mismatch_rates)
-    average_mismatch = sum_mismatch / len(mismatch_rates) if mismatch_rates else 0
+def calculate_term_frequency_mismatch(src, tgt):
+    denominator = np.where(src > 0, src, 1)  # avoid division by zero
+    mismatch_rates = np.abs(tgt - src) / denominator
+    sum_mismatch = float(mismatch_rates.sum())
+    average_mismatch = sum_mismatch / len(mismatch_rates) if len(mismatch_rates) else 0
     return sum_mismatch, average_mismatch
 
-def count_positive_terms(words, translations, source_counts, target_counts):
-    source_positive_count = sum(1 for w in words if source_counts.get(w, 0) > 0)
-    target_positive_count = sum(1 for t in translations if target_counts.get(t, 0) > 0)
+def count_positive_terms(src, tgt):
+    source_positive_count = int(np.count_nonzero(src))
+    target_positive_count = int(np.count_nonzero(tgt))
     return source_positive_count, target_positive_count
 
-def count_both_positive_terms(words, translations, source_counts, target_counts):
-    count = sum(
-        1 for w, t in zip(words, translations)
-        if source_counts.get(w, 0) > 0 and target_counts.get(t, 0) > 0
-    )
+def count_both_positive_terms(src, tgt):
+    count = int(np.count_nonzero((src > 0) & (tgt > 0)))
     return count
 
+def build_results_table(words, translations, source_array, target_array, target_column):
+    # Only keep glossary rows found in at least one of the two documents
+    mask = (source_array > 0) | (target_array > 0)
+    return pd.DataFrame({
+        'Word': words[mask],
+        'Count in Source': source_array[mask],
+        'Translation': translations[mask],
+        target_column: target_array[mask]
+    })
+
 if st.button("Process Files"):
     if not glossary_file or not source_pdf or not target_pdf:
         st.error("Please upload glossary, source PDF, and target PDF files.")
@@ -93,7 +266,7 @@ if st.button("Process Files"):
         try:
             # Read glossary Excel
             try:
-                df = pd.read_excel(glossary_file)
+                df = read_glossary(glossary_file.getvalue())
                 total_glossary_terms = len(df)  # Total terms excluding header
                 st.write(f"Total number of glossary terms (excluding header): {total_glossary_terms}")
             except Exception as e:
@@ -105,98 +278,56 @@ if st.button("Process Files"):
                 st.stop()
 
             df.columns = [col.lower() for col in df.columns]
-            words = df['word'].astype(str).tolist()
-            translations = df['translations'].astype(str).tolist()
+            # Keep the glossary columns as arrays, normalized (lowercased, stripped) once
+            words = df['word'].astype(str).str.lower().str.strip().to_numpy()
+            translations = df['translations'].astype(str).str.lower().str.strip().to_numpy()
 
             # Extract text from PDFs
             try:
-                source_text = extract_text_from_pdf(source_pdf)
+                source_pages = extract_pages_from_pdf(source_pdf.getvalue())
             except Exception as e:
                 st.error(f"Error reading source PDF: {e}")
                 st.stop()
 
             try:
-                target_text = extract_text_from_pdf(target_pdf)
+                target_pages = extract_pages_from_pdf(target_pdf.getvalue())
             except Exception as e:
                 st.error(f"Error reading target PDF: {e}")
                 st.stop()
 
-            benchmark_text = ""
+            benchmark_pages = []
             if benchmark_pdf:
                 try:
-                    benchmark_text = extract_text_from_pdf(benchmark_pdf)
+                    benchmark_pages = extract_pages_from_pdf(benchmark_pdf.getvalue())
                 except Exception as e:
                     st.error(f"Error reading benchmark PDF: {e}")
                     st.stop()
 
-            # Normalize terms and texts
-            words = [normalize_text(w) for w in words]
-            translations = [normalize_text(t) for t in translations]
-            source_text = normalize_text(source_text)
-            target_text = normalize_text(target_text)
-            benchmark_text = normalize_text(benchmark_text) if benchmark_pdf else ""
-
-            # Count occurrences
-            source_counts = count_terms(source_text, words)
-            target_counts = count_terms(target_text, translations)
-            benchmark_counts = count_terms(benchmark_text, translations) if benchmark_pdf else None
+            # Count occurrences, scanning each document once for all unique terms
+            # Repeated words/translations are counted once and gathered back per row
+            glossary_terms, term_ids = np.unique(np.concatenate([words, translations]), return_inverse=True)
+            word_ids, translation_ids = term_ids[:len(words)], term_ids[len(words):]
+            automaton = build_automaton(tuple(glossary_terms))
+            src = count_terms(source_pages, automaton, glossary_terms)[word_ids]
+            tgt = count_terms(target_pages, automaton, glossary_terms)[translation_ids]
+            bench = count_terms(benchmark_pages, automaton, glossary_terms)[translation_ids] if benchmark_pdf else None
 
             # Combine results for source and target
-            combined_results = []
-            for w, t in zip(words, translations):
-                w_count = source_counts.get(w, 0)
-                t_count = target_counts.get(t, 0)
-                if w_count > 0 or t_count > 0:
-                    combined_results.append({
-                        'Word': w,
-                        'Count in Source': w_count,
-                        'Translation': t,
-                        'Count in Target': t_count
-                    })
+            combined_results = build_results_table(words, translations, src, tgt, 'Count in Target')
 
             st.subheader("Word and Translation Counts (Source & Target)")
-            st.dataframe(pd.DataFrame(combined_results))
+            st.dataframe(combined_results)
 
             if benchmark_pdf:
-                benchmark_results = []
-                for w, t in zip(words, translations):
-                    w_count = source_counts.get(w, 0)
-                    b_count = benchmark_counts.get(t, 0)
-                    if w_count > 0 or b_count > 0:
-                        benchmark_results.append({
-                            'Word': w,
-                            'Count in Source': w_count,
-                            'Translation': t,
-                            'Count in Benchmark': b_count
-                        })
-                st.subheader("Word and Translation Counts (Source & Benchmark)")
-                st.dataframe(pd.DataFrame(benchmark_results))
-            if benchmark_pdf:
-                benchmark_results = []
-                for w, t in zip(words, translations):
-                    w_count = source_counts.get(w, 0)
-                    b_count = benchmark_counts.get(t, 0)
-                    if w_count > 0 or b_count > 0:
-                        benchmark_results.append({
-                            'Word': w,
-                            'Count in Source': w_count,
-                            'Translation': t,
-                            'Count in Benchmark': b_count
-                        })
+                benchmark_results = build_results_table(words, translations, src, bench, 'Count in Benchmark')
                 st.subheader("Word and Translation Counts (Source & Benchmark)")
-                st.dataframe(pd.DataFrame(benchmark_results))
+                st.dataframe(benchmark_results)
 
                 # KPIs for Source vs Benchmark (same as Source vs Target)
-                kpis_benchmark = calculate_kpis_fixed(words, translations, source_counts, benchmark_counts)
-                sum_mismatch_bench, average_mismatch_bench = calculate_term_frequency_mismatch(
-                    words, translations, source_counts, benchmark_counts
-                )
-                source_positive_count_bench, benchmark_positive_count = count_positive_terms(
-                    words, translations, source_counts, benchmark_counts
-                )
-                both_positive_count_bench = count_both_positive_terms(
-                    words, translations, source_counts, benchmark_counts
-                )
+                kpis_benchmark = calculate_kpis_fixed(src, bench)
+                sum_mismatch_bench, average_mismatch_bench = calculate_term_frequency_mismatch(src, bench)
+                source_positive_count_bench, benchmark_positive_count = count_positive_terms(src, bench)
+                both_positive_count_bench = count_both_positive_terms(src, bench)
 
                 st.subheader("KPIs (Source & Benchmark)")
                 st.markdown(f"""
@@ -213,10 +344,10 @@ if st.button("Process Files"):
                 """)
 
             # Calculate KPIs
-            kpis = calculate_kpis_fixed(words, translations, source_counts, target_counts)
-            sum_mismatch, average_mismatch = calculate_term_frequency_mismatch(words, translations, source_counts, target_counts)
-            source_positive_count, target_positive_count = count_positive_terms(words, translations, source_counts, target_counts)
-            both_positive_count = count_both_positive_terms(words, translations, source_counts, target_counts)
+            kpis = calculate_kpis_fixed(src, tgt)
+            sum_mismatch, average_mismatch = calculate_term_frequency_mismatch(src, tgt)
+            source_positive_count, target_positive_count = count_positive_terms(src, tgt)
+            both_positive_count = count_both_positive_terms(src, tgt)
 
             st.subheader("KPIs (Source & Target)")
             st.markdown(f"""
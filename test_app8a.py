@@ -0,0 +1,63 @@
+import random
+import re
+
+import pytest
+
+import app8a
+
+ALPHABET = "abé _-.ß"
+
+
+@pytest.fixture(params=["pyahocorasick", "fallback"])
+def build_automaton(request, monkeypatch):
+    if request.param == "pyahocorasick":
+        if app8a.ahocorasick is None:
+            pytest.skip("pyahocorasick is not installed")
+    else:
+        monkeypatch.setattr(app8a, "ahocorasick", None)
+    app8a.build_automaton.clear()
+    yield lambda terms: app8a.build_automaton(tuple(terms))
+    app8a.build_automaton.clear()
+
+
+def regex_counts(text, terms):
+    # The original per-term implementation the scanner must agree with
+    return [len(re.findall(r'\b' + re.escape(term) + r'\b', text)) for term in terms]
+
+
+def random_string(rng, max_length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(1, max_length)))
+
+
+def test_count_terms_matches_regex(build_automaton):
+    rng = random.Random(0)
+    for _ in range(2000):
+        pages = [random_string(rng, 12) for _ in range(rng.randint(0, 5))]
+        terms = sorted({random_string(rng, 6).strip() for _ in range(6)} - {""}) or ["a"]
+        counts = app8a.count_terms(pages, build_automaton(terms), terms)
+        assert counts.tolist() == regex_counts(" ".join(pages), terms), (pages, terms)
+
+
+def test_count_terms_nested_and_spanning_pages(build_automaton):
+    terms = ["data", "data center", "center"]
+    pages = ["the data", "center and data center"]
+    counts = app8a.count_terms(pages, build_automaton(terms), terms)
+    assert counts.tolist() == [2, 2, 2]
+
+
+def test_count_terms_large_alphabet(build_automaton):
+    rng = random.Random(1)
+    terms = sorted({''.join(chr(0x4e00 + rng.randrange(3000)) for _ in range(3)) for _ in range(500)})
+    text = "".join(rng.choice(terms) + rng.choice(" 。，") for _ in range(2000))
+    counts = app8a.count_terms([text], build_automaton(terms), terms)
+    assert counts.tolist() == regex_counts(text, terms)
+
+
+def test_fallback_stores_only_trie_edges():
+    automaton = app8a.CodepointAutomaton()
+    terms = ["数据中心", "数据", "中心"]
+    for index, term in enumerate(terms):
+        automaton.add_word(term, (index, len(term)))
+    automaton.make_automaton()
+    # One edge per trie node other than the root
+    assert len(automaton.edge_codes) == len(automaton.fail) - 1